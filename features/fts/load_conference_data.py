@@ -3,39 +3,30 @@
 # dependencies = [
 #   "beautifulsoup4>=4.12.0",
 #   "lxml>=4.9.0",
-#   "psycopg2-binary>=2.9.9",
-#   "python-dotenv>=1.0.0",
+#   "pgplayground",
+#   "psycopg[binary]>=3.2",
 #   "ujson>=5.10.0",
 # ]
+#
+# [tool.uv.sources]
+# pgplayground = { path = "../..", editable = true }
 # ///
 """
 Parse the PGConfEU 2025 schedule XML and load it into PostgreSQL.
 """
 
-import os
 import re
 import sys
 from datetime import datetime
 from pathlib import Path
 
-import psycopg2
+import psycopg
 import ujson as json
 from bs4 import BeautifulSoup
-from dotenv import load_dotenv
 from lxml import etree
-from psycopg2.extras import execute_values
 
-# Load environment variables
-load_dotenv("../../.env")
-
-# Database connection parameters
-conn_params = {
-    "dbname": "testdb",  # Using the main database with ICU collation
-    "user": os.getenv("DB_USER", "testuser"),
-    "password": os.getenv("DB_PASSWORD", "testpassword"),
-    "host": os.getenv("DB_HOST", "localhost"),
-    "port": int(os.getenv("DB_PORT", 5432)),
-}
+from pgplayground.db import conn_params, connection, healthcheck
+from pgplayground.instrument import instrument
 
 
 def clean_html(text):
@@ -190,106 +181,93 @@ def load_events_to_database(events):
         print("No events to load")
         return False
 
-    conn = None
     try:
         # Connect to database
         print(f"Connecting to database: {conn_params['dbname']}")
-        conn = psycopg2.connect(**conn_params)
-        conn.autocommit = False
-        cur = conn.cursor()
-
-        # Clear existing data
-        print("Clearing existing conference data...")
-        cur.execute("TRUNCATE TABLE conference_events RESTART IDENTITY CASCADE")
-
-        # Prepare data for bulk insert
-        insert_data = [
-            (
-                event["event_id"],
-                event["title"],
-                event["abstract"],
-                event["speakers"],
-                event["url"],
-                event["room"],
-                event["track"],
-                event["duration"],
-                event["start_time"],
-                event["metadata"],
-            )
-            for event in events
-        ]
-
-        # Bulk insert using execute_values (much faster than individual inserts)
-        print(f"Loading {len(events)} events into database...")
-        insert_query = """
-            INSERT INTO conference_events (
-                event_id, title, abstract, speakers, url,
-                room, track, duration, start_time, metadata
-            ) VALUES %s
-            ON CONFLICT (event_id) DO UPDATE SET
-                title = EXCLUDED.title,
-                abstract = EXCLUDED.abstract,
-                speakers = EXCLUDED.speakers,
-                url = EXCLUDED.url,
-                room = EXCLUDED.room,
-                track = EXCLUDED.track,
-                duration = EXCLUDED.duration,
-                start_time = EXCLUDED.start_time,
-                metadata = EXCLUDED.metadata
-        """
-
-        execute_values(
-            cur,
-            insert_query,
-            insert_data,
-            template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb)",
-            page_size=100,
-        )
-
-        # Commit the transaction
-        conn.commit()
-
-        # Verify the load
-        cur.execute("SELECT COUNT(*) FROM conference_events")
-        count = cur.fetchone()[0]
-        print(f"✓ Successfully loaded {count} events into database")
-
-        # Show sample of loaded data
-        cur.execute(
+        with connection() as conn, conn.cursor() as cur:
+            # Clear existing data
+            print("Clearing existing conference data...")
+            cur.execute("TRUNCATE TABLE conference_events RESTART IDENTITY CASCADE")
+
+            # Prepare data for bulk insert
+            with metrics.phase("serialize"):
+                insert_data = [
+                    (
+                        event["event_id"],
+                        event["title"],
+                        event["abstract"],
+                        event["speakers"],
+                        event["url"],
+                        event["room"],
+                        event["track"],
+                        event["duration"],
+                        event["start_time"],
+                        event["metadata"],
+                    )
+                    for event in events
+                ]
+
+            # Bulk insert using executemany, which pipelines the inserts in one round-trip
+            print(f"Loading {len(events)} events into database...")
+            insert_query = """
+                INSERT INTO conference_events (
+                    event_id, title, abstract, speakers, url,
+                    room, track, duration, start_time, metadata
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb)
+                ON CONFLICT (event_id) DO UPDATE SET
+                    title = EXCLUDED.title,
+                    abstract = EXCLUDED.abstract,
+                    speakers = EXCLUDED.speakers,
+                    url = EXCLUDED.url,
+                    room = EXCLUDED.room,
+                    track = EXCLUDED.track,
+                    duration = EXCLUDED.duration,
+                    start_time = EXCLUDED.start_time,
+                    metadata = EXCLUDED.metadata
+            """
+
+            with metrics.phase("execute"):
+                cur.executemany(insert_query, insert_data)
+            metrics.count("rows", len(insert_data))
+
+            # Commit the transaction
+            with metrics.phase("commit"):
+                conn.commit()
+
+            # Verify the load
+            cur.execute("SELECT COUNT(*) FROM conference_events")
+            count = cur.fetchone()[0]
+            print(f"✓ Successfully loaded {count} events into database")
+
+            # Show sample of loaded data
+            cur.execute(
+                """
+                SELECT title, track, room, speakers
+                FROM conference_events
+                WHERE title != ''
+                LIMIT 5
             """
-            SELECT title, track, room, speakers
-            FROM conference_events
-            WHERE title != ''
-            LIMIT 5
-        """
-        )
-        print("\nSample of loaded events:")
-        for row in cur.fetchall():
-            title, track, room, speakers = row
-            print(f"  - {title[:50]}... [{track}] in {room}")
-            if speakers:
-                print(f"    Speakers: {speakers[:60]}")
-
-        # Update table statistics for query optimizer
-        print("\nUpdating table statistics...")
-        cur.execute("ANALYZE conference_events")
-        conn.commit()
+            )
+            print("\nSample of loaded events:")
+            for row in cur.fetchall():
+                title, track, room, speakers = row
+                print(f"  - {title[:50]}... [{track}] in {room}")
+                if speakers:
+                    print(f"    Speakers: {speakers[:60]}")
+
+            # Update table statistics for query optimizer
+            print("\nUpdating table statistics...")
+            cur.execute("ANALYZE conference_events")
+            conn.commit()
 
         return True
 
-    except psycopg2.Error as e:
+    except psycopg.Error as e:
         print(f"✗ Database error: {e}", file=sys.stderr)
-        if conn:
-            conn.rollback()
         return False
     except Exception as e:
         print(f"✗ Unexpected error: {e}", file=sys.stderr)
-        if conn:
-            conn.rollback()
         return False
-    finally:
-        if conn:
-            conn.close()
 
 
 def main():
@@ -306,12 +284,16 @@ def main():
     print("=" * 60)
     print("Parsing conference schedule...")
     print("=" * 60)
-    events = parse_schedule_xml(xml_file)
+    with metrics.phase("parse"):
+        events = parse_schedule_xml(xml_file)
 
     if not events:
         print("✗ No events parsed from XML")
         return False
 
+    if not healthcheck():
+        return False
+
     # Load events into database
     print("\n" + "=" * 60)
     print("Loading data into PostgreSQL...")
@@ -328,5 +310,7 @@ def main():
 
 
 if __name__ == "__main__":
+    metrics = instrument("load_conference_data")
+
     success = main()
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = [
+#   "pgplayground",
+#   "psycopg[binary]>=3.2",
+# ]
+#
+# [tool.uv.sources]
+# pgplayground = { path = "../..", editable = true }
+# ///
+"""
+Run an index benchmark matrix against the customer_orders table.
+
+For every table size the table is grown (or regenerated) to the requested
+number of rows. Then, for every index in the matrix file, the index is built,
+its build time and size are recorded, and every query is run a number of
+times to collect latency percentiles and the shape of the chosen plan.
+A baseline without any extra index is always measured first.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import psycopg
+
+from pgplayground.db import connection, healthcheck
+
+# Same distribution as init.sql so results stay comparable across sizes
+GENERATE_ROWS_SQL = """
+    INSERT INTO customer_orders (customer_id, product_id, order_date, quantity, amount, payment_method, category, region)
+    SELECT
+        (random() * 10000)::INTEGER,
+        (random() * 1000)::INTEGER,
+        CURRENT_DATE - ((random() * 1095)::INTEGER),
+        (random() * 10 + 1)::INTEGER,
+        (random() * 500 + 10)::DECIMAL(10,2),
+        (ARRAY['Credit Card', 'PayPal', 'Bank Transfer', 'Cash', 'Crypto'])[(random() * 4 + 1)::INTEGER],
+        (ARRAY['Electronics', 'Clothing', 'Food', 'Books', 'Home', 'Sports', 'Beauty', 'Toys'])[(random() * 7 + 1)::INTEGER],
+        (ARRAY['North', 'South', 'East', 'West', 'Central'])[(random() * 4 + 1)::INTEGER]
+    FROM generate_series(1, %s)
+"""
+
+
+def load_matrix(path):
+    """Load the declarative list of indexes and queries from a JSON file."""
+    with open(path) as f:
+        matrix = json.load(f)
+
+    for index in matrix["indexes"]:
+        if not {"name", "definition"} <= index.keys():
+            raise ValueError(f"Index entry needs 'name' and 'definition': {index}")
+    for query in matrix["queries"]:
+        if not {"name", "sql"} <= query.keys():
+            raise ValueError(f"Query entry needs 'name' and 'sql': {query}")
+
+    return matrix
+
+
+def resize_table(cur, num_rows):
+    """Grow customer_orders to num_rows, regenerating it if it is too large."""
+    cur.execute("SELECT count(*) FROM customer_orders")
+    current_rows = cur.fetchone()[0]
+
+    if current_rows > num_rows:
+        print(f"Truncating customer_orders ({current_rows:,} rows)...")
+        cur.execute("TRUNCATE customer_orders RESTART IDENTITY")
+        current_rows = 0
+
+    if current_rows < num_rows:
+        print(f"Generating {num_rows - current_rows:,} rows...")
+        cur.execute(GENERATE_ROWS_SQL, (num_rows - current_rows,))
+
+    # VACUUM sets the visibility map so index-only scans are possible
+    cur.execute("VACUUM ANALYZE customer_orders")
+
+
+def drop_matrix_indexes(cur, matrix):
+    """Drop every index from the matrix, in case a previous run was aborted."""
+    for index in matrix["indexes"]:
+        cur.execute(f"DROP INDEX IF EXISTS {index['name']}")
+
+
+def plan_shape(plan):
+    """Summarise a JSON plan as nested node types, e.g. 'Bitmap Heap Scan > Bitmap Index Scan(idx)'."""
+    node = plan["Node Type"]
+    if "Index Name" in plan:
+        node += f"({plan['Index Name']})"
+
+    children = [plan_shape(child) for child in plan.get("Plans", [])]
+    if not children:
+        return node
+    if len(children) == 1:
+        return f"{node} > {children[0]}"
+    return f"{node} > [{', '.join(children)}]"
+
+
+def run_query(cur, sql, iterations):
+    """Run a query repeatedly and return latency percentiles and plan shape.
+
+    Latency is the server-side execution time reported by EXPLAIN ANALYZE with
+    per-node timing disabled, so transferring large result sets to the client
+    does not drown out the effect of the index.
+    """
+    # Warm-up run so the first measurement does not pay for cold caches
+    cur.execute(f"EXPLAIN (ANALYZE, TIMING OFF, FORMAT JSON) {sql}")
+    cur.fetchone()
+
+    latencies = []
+    shape = None
+    for _ in range(iterations):
+        cur.execute(f"EXPLAIN (ANALYZE, TIMING OFF, FORMAT JSON) {sql}")
+        result = cur.fetchone()[0][0]
+        latencies.append(result["Execution Time"])
+        shape = plan_shape(result["Plan"])
+
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+    else:
+        p50 = p95 = p99 = latencies[0]
+
+    return {
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "min_ms": round(min(latencies), 3),
+        "max_ms": round(max(latencies), 3),
+        "plan": shape,
+    }
+
+
+def benchmark_index(cur, index, queries, iterations):
+    """Build an index (or none for the baseline), measure it, then drop it."""
+    result = {"index": index["name"] if index else None}
+
+    if index:
+        start = time.perf_counter()
+        cur.execute(f"CREATE INDEX {index['name']} ON {index['definition']}")
+        result["build_seconds"] = round(time.perf_counter() - start, 3)
+
+        cur.execute("SELECT pg_relation_size(%s::regclass)", (index["name"],))
+        result["size_bytes"] = cur.fetchone()[0]
+        cur.execute("ANALYZE customer_orders")
+
+    result["queries"] = {}
+    for query in queries:
+        result["queries"][query["name"]] = run_query(cur, query["sql"], iterations)
+
+    if index:
+        cur.execute(f"DROP INDEX {index['name']}")
+
+    return result
+
+
+def print_results(num_rows, results):
+    """Print the results for one table size as a table."""
+    print(f"\n=== customer_orders with {num_rows:,} rows ===")
+    print(
+        f"{'index':<24} {'build s':>8} {'size MB':>8}  {'query':<22} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  plan"
+    )
+    for result in results:
+        name = result["index"] or "(no index)"
+        build = f"{result['build_seconds']:.2f}" if "build_seconds" in result else "-"
+        size = f"{result['size_bytes'] / 1024 / 1024:.1f}" if "size_bytes" in result else "-"
+        for query_name, stats in result["queries"].items():
+            print(
+                f"{name:<24} {build:>8} {size:>8}  {query_name:<22} "
+                f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}  {stats['plan']}"
+            )
+            name, build, size = "", "", ""
+
+
+def run_benchmark(matrix, sizes, iterations, output):
+    """Run the full matrix for every table size and write the results as JSON."""
+    report = {"iterations": iterations, "sizes": []}
+
+    try:
+        # Autocommit is required for VACUUM and keeps each index build in its own transaction
+        with connection(autocommit=True) as conn, conn.cursor() as cur:
+            drop_matrix_indexes(cur, matrix)
+
+            for num_rows in sorted(sizes):
+                resize_table(cur, num_rows)
+
+                results = [benchmark_index(cur, None, matrix["queries"], iterations)]
+                for index in matrix["indexes"]:
+                    print(f"Benchmarking {index['name']} at {num_rows:,} rows...")
+                    results.append(
+                        benchmark_index(cur, index, matrix["queries"], iterations)
+                    )
+
+                print_results(num_rows, results)
+                report["sizes"].append({"rows": num_rows, "results": results})
+
+                # Write after every size so a long run still leaves usable results
+                Path(output).write_text(json.dumps(report, indent=2))
+
+        print(f"\n✓ Results written to {output}")
+        return True
+
+    except psycopg.Error as e:
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the index benchmark matrix")
+    parser.add_argument(
+        "--matrix",
+        default="benchmark.json",
+        help="JSON file with the indexes and queries to benchmark (default: benchmark.json)",
+    )
+    parser.add_argument(
+        "--sizes",
+        default="500000,5000000,50000000",
+        help="Comma-separated table sizes in rows (default: 500000,5000000,50000000)",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=20,
+        help="Number of times each query is run per index (default: 20)",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark_results.json",
+        help="File to write the JSON results to (default: benchmark_results.json)",
+    )
+    args = parser.parse_args()
+
+    if args.iterations < 1:
+        parser.error("--iterations must be at least 1")
+
+    if not healthcheck():
+        sys.exit(1)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    success = run_benchmark(load_matrix(args.matrix), sizes, args.iterations, args.output)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = [
+#   "pgplayground",
+#   "psycopg[binary]>=3.2",
+# ]
+#
+# [tool.uv.sources]
+# pgplayground = { path = "../..", editable = true }
+# ///
+"""
+Report index problems using the cumulative statistics views.
+
+The advisor reports:
+- Unused indexes (never scanned since the statistics were last reset)
+- Redundant indexes (a prefix of another index on the same columns)
+- Bloated B-tree indexes (requires the pgstattuple extension)
+- Missing-index candidates from statements whose plans sequentially scan
+  large tables (requires the pg_stat_statements extension)
+
+Removal candidates include an estimate of the index writes that dropping
+them would save, based on the writes seen by the table.
+"""
+
+import argparse
+import math
+import re
+import sys
+
+import psycopg
+
+from pgplayground.db import connection, healthcheck
+
+# B-tree indexes are built with a default fillfactor of 90
+BTREE_FILLFACTOR = 90
+
+# A few partly filled leaf pages are normal, not bloat
+MIN_BLOAT_LEAF_PAGES = 10
+
+# Matches a comparison on a column in a verbose plan filter, like
+# "customer_orders.customer_id = $1" or "(customer_orders.category)::text = 'Books'::text".
+# LIKE (~~) and <> are left out, since a plain B-tree cannot serve them.
+COMPARISON_PATTERN = re.compile(
+    r"\(*(?:\w+\.)?(\w+)\)?(?:::[\w ]+?)?\s*(=|<=|>=|<(?!>)|>)\s*(ANY\b)?"
+)
+
+# Index access methods that can serve a range condition on their leading column
+RANGE_ACCESS_METHODS = {"btree", "brin"}
+
+
+def extension_installed(cur, name):
+    """Check whether an extension is installed in the current database."""
+    cur.execute("SELECT 1 FROM pg_extension WHERE extname = %s", (name,))
+    return cur.fetchone() is not None
+
+
+def fetch_indexes(cur):
+    """Fetch all user indexes with their key columns, usage, and size."""
+    cur.execute("""
+        SELECT
+            s.indexrelid,
+            s.schemaname,
+            s.relname,
+            s.indexrelname,
+            am.amname,
+            ARRAY(
+                SELECT a.attname
+                FROM unnest(i.indkey[0:i.indnkeyatts - 1]) WITH ORDINALITY AS k(attnum, ord)
+                JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+                ORDER BY k.ord
+            ) AS columns,
+            i.indisunique OR i.indisprimary AS is_unique,
+            i.indexprs IS NOT NULL OR i.indpred IS NOT NULL AS is_special,
+            s.idx_scan,
+            pg_relation_size(s.indexrelid) AS size_bytes
+        FROM pg_stat_user_indexes s
+        JOIN pg_index i ON i.indexrelid = s.indexrelid
+        JOIN pg_class c ON c.oid = s.indexrelid
+        JOIN pg_am am ON am.oid = c.relam
+        ORDER BY s.schemaname, s.relname, s.indexrelname
+    """)
+    columns = [desc.name for desc in cur.description]
+    return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+def fetch_table_writes(cur):
+    """Fetch the index-maintaining writes per table.
+
+    Every insert and every non-HOT update adds an entry to each index on the
+    table, so that is the write cost each index contributes to.
+    """
+    cur.execute("""
+        SELECT
+            schemaname,
+            relname,
+            n_tup_ins + n_tup_upd - n_tup_hot_upd AS index_writes
+        FROM pg_stat_user_tables
+    """)
+    return {(schema, table): writes for schema, table, writes in cur.fetchall()}
+
+
+def write_savings(index, indexes, table_writes):
+    """Describe the index writes saved by dropping an index."""
+    table_key = (index["schemaname"], index["relname"])
+    siblings = [i for i in indexes if (i["schemaname"], i["relname"]) == table_key]
+    writes = table_writes.get(table_key, 0)
+    return (
+        f"saves {writes:,} index writes so far "
+        f"(1 of {len(siblings)} indexes maintained on every write)"
+    )
+
+
+def find_unused(indexes):
+    """Find indexes that have never been scanned and do not enforce uniqueness."""
+    return [i for i in indexes if i["idx_scan"] == 0 and not i["is_unique"]]
+
+
+def find_redundant(indexes):
+    """Find indexes whose key columns are a leading prefix of another index.
+
+    Only plain B-tree indexes are considered, since only they can serve a
+    query on a leading prefix of their columns. Exact duplicates of any
+    access method are reported once, keeping the oldest index.
+    """
+    redundant = []
+    for index in indexes:
+        if index["is_unique"] or index["is_special"] or not index["columns"]:
+            continue
+
+        for other in indexes:
+            if (
+                other["indexrelid"] == index["indexrelid"]
+                or other["is_special"]
+                or (other["schemaname"], other["relname"])
+                != (index["schemaname"], index["relname"])
+                or other["amname"] != index["amname"]
+            ):
+                continue
+
+            covered = other["columns"][: len(index["columns"])] == index["columns"]
+            if not covered:
+                continue
+
+            is_duplicate = other["columns"] == index["columns"]
+            if is_duplicate and other["indexrelid"] > index["indexrelid"] and not other["is_unique"]:
+                # Report only the newer of two identical indexes
+                continue
+            if not is_duplicate and index["amname"] != "btree":
+                continue
+
+            redundant.append((index, other))
+            break
+
+    return redundant
+
+
+def find_bloated(cur, indexes, min_bloat_ratio):
+    """Estimate B-tree bloat from the leaf density reported by pgstatindex."""
+    bloated = []
+    for index in indexes:
+        if index["amname"] != "btree" or index["size_bytes"] == 0:
+            continue
+
+        cur.execute(
+            "SELECT avg_leaf_density, leaf_pages FROM pgstatindex(%s::regclass)",
+            (f'"{index["schemaname"]}"."{index["indexrelname"]}"',),
+        )
+        density, leaf_pages = cur.fetchone()
+        # Empty indexes report NaN for the density
+        if math.isnan(density) or leaf_pages < MIN_BLOAT_LEAF_PAGES:
+            continue
+
+        bloat_ratio = max(0.0, 1 - density / BTREE_FILLFACTOR)
+        if bloat_ratio >= min_bloat_ratio:
+            bloated.append((index, bloat_ratio, int(index["size_bytes"] * bloat_ratio)))
+
+    return bloated
+
+
+def seq_scan_nodes(plan):
+    """Yield every sequential scan node with a filter in a JSON plan."""
+    if plan["Node Type"] == "Seq Scan" and "Filter" in plan:
+        yield plan
+    for child in plan.get("Plans", []):
+        yield from seq_scan_nodes(child)
+
+
+def _strip_parens(expr):
+    """Remove parentheses that enclose the whole expression."""
+    expr = expr.strip()
+    while expr.startswith("(") and _closing_paren(expr, 0) == len(expr) - 1:
+        expr = expr[1:-1].strip()
+    return expr
+
+
+def _closing_paren(expr, start):
+    """Return the index of the parenthesis closing the one at start."""
+    depth = 0
+    in_quotes = False
+    for i in range(start, len(expr)):
+        char = expr[i]
+        if char == "'":
+            in_quotes = not in_quotes
+        elif in_quotes:
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _split_top_level(expr, keyword):
+    """Split an expression on AND or OR outside parentheses and quotes."""
+    parts = []
+    depth = 0
+    in_quotes = False
+    start = 0
+    separator = f" {keyword} "
+    i = 0
+    while i < len(expr):
+        char = expr[i]
+        if char == "'":
+            in_quotes = not in_quotes
+        elif not in_quotes:
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif depth == 0 and expr.startswith(separator, i):
+                parts.append(expr[start:i])
+                i += len(separator)
+                start = i
+                continue
+        i += 1
+    parts.append(expr[start:])
+    return [_strip_parens(part) for part in parts]
+
+
+def _conjunction_key(expr, table_columns):
+    """Build the index key for an AND of conditions.
+
+    Returns (columns, uses_range): equality columns first, followed by at
+    most one range column, since a B-tree cannot use columns after the first
+    range condition to narrow the scan. Conditions that are not a simple
+    comparison on a column, including nested ORs, are ignored.
+    """
+    equality, ranges = [], []
+    for condition in _split_top_level(expr, "AND"):
+        match = COMPARISON_PATTERN.match(condition)
+        if not match or len(_split_top_level(condition, "OR")) > 1:
+            continue
+        column, operator, is_any = match.groups()
+        if column not in table_columns or column in equality or column in ranges:
+            continue
+        if operator == "=" or is_any:
+            equality.append(column)
+        else:
+            ranges.append(column)
+    return equality + ranges[:1], bool(ranges)
+
+
+def filter_candidates(filter_text, table_columns):
+    """Turn a plan filter into index key candidates.
+
+    Top-level AND conditions form one compound key. A top-level OR can only
+    be served by a BitmapOr over one index per branch, so each branch becomes
+    its own candidate, and the OR is skipped if any branch has no indexable
+    condition.
+    """
+    branches = _split_top_level(_strip_parens(filter_text), "OR")
+    candidates = [_conjunction_key(branch, table_columns) for branch in branches]
+    if any(not columns for columns, _ in candidates):
+        return []
+    return candidates
+
+
+def is_covered(columns, uses_range, schema, table, indexes):
+    """Check whether an existing index already serves an index key.
+
+    Equality columns can be served in any order, so they are compared as a
+    set against the leading columns of the index. Only the trailing range
+    column has to follow them. A B-tree serves any such key, a range
+    condition can also be served by a BRIN index, and a single equality
+    column by a hash index.
+    """
+    equality = columns[:-1] if uses_range else columns
+    for index in indexes:
+        if (index["schemaname"], index["relname"]) != (schema, table) or index["is_special"]:
+            continue
+        leading = index["columns"][: len(columns)]
+        if set(leading[: len(equality)]) != set(equality):
+            continue
+        if leading[len(equality) :] != columns[len(equality) :]:
+            continue
+        if index["amname"] == "btree":
+            return True
+        if uses_range and index["amname"] in RANGE_ACCESS_METHODS:
+            return True
+        if not uses_range and index["amname"] == "hash" and len(columns) == 1:
+            return True
+    return False
+
+
+def find_missing(cur, indexes, min_seq_rows, max_selectivity, top_statements):
+    """Find missing-index candidates from statements that seq scan large tables.
+
+    The most expensive statements in pg_stat_statements are explained with
+    GENERIC_PLAN, and every sequential scan with a filter over a table that
+    has on average at least min_seq_rows rows read per sequential scan is
+    turned into index suggestions, unless an index that can serve them
+    already exists. Filters estimated to match more than max_selectivity of
+    the table are skipped, since a sequential scan is the right plan for them.
+    """
+    cur.execute(
+        """
+        SELECT s.schemaname, s.relname, c.reltuples
+        FROM pg_stat_user_tables s
+        JOIN pg_class c ON c.oid = s.relid
+        WHERE s.seq_scan > 0 AND s.seq_tup_read / s.seq_scan >= %s
+        """,
+        (min_seq_rows,),
+    )
+    heavy_tables = {(schema, table): reltuples for schema, table, reltuples in cur.fetchall()}
+    if not heavy_tables:
+        return []
+
+    cur.execute(
+        """
+        SELECT query, calls, total_exec_time
+        FROM pg_stat_statements
+        WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+          AND query ~* '^\\s*(select|update|delete)\\s'
+        ORDER BY total_exec_time DESC
+        LIMIT %s
+        """,
+        (top_statements,),
+    )
+    statements = cur.fetchall()
+
+    candidates = {}
+    for query, calls, total_exec_time in statements:
+        try:
+            # VERBOSE adds the schema to each scan node
+            cur.execute(f"EXPLAIN (GENERIC_PLAN, VERBOSE, FORMAT JSON) {query}")
+        except psycopg.Error:
+            # Statements referencing dropped objects or temp tables cannot be explained
+            continue
+        plan = cur.fetchone()[0][0]["Plan"]
+
+        for node in seq_scan_nodes(plan):
+            schema, table = node["Schema"], node["Relation Name"]
+            if (schema, table) not in heavy_tables:
+                continue
+
+            # reltuples is -1 until the table is first analyzed, then the share is unknown
+            reltuples = heavy_tables[(schema, table)]
+            if reltuples > 0 and node["Plan Rows"] / reltuples > max_selectivity:
+                continue
+
+            cur.execute(
+                """
+                SELECT attname FROM pg_attribute
+                WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+                """,
+                (f'"{schema}"."{table}"',),
+            )
+            table_columns = {row[0] for row in cur.fetchall()}
+
+            for columns, uses_range in filter_candidates(node["Filter"], table_columns):
+                if is_covered(columns, uses_range, schema, table, indexes):
+                    continue
+
+                key = (f"{schema}.{table}", tuple(columns))
+                candidate = candidates.setdefault(
+                    key, {"calls": 0, "total_exec_time": 0.0, "query": query}
+                )
+                candidate["calls"] += calls
+                candidate["total_exec_time"] += total_exec_time
+
+    return sorted(candidates.items(), key=lambda item: -item[1]["total_exec_time"])
+
+
+def format_size(num_bytes):
+    """Format a size in bytes for display."""
+    for unit in ("B", "kB", "MB", "GB"):
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.1f} {unit}" if unit != "B" else f"{num_bytes} B"
+        num_bytes /= 1024
+
+
+def print_section(title, lines):
+    """Print a report section."""
+    print(f"\n=== {title} ===")
+    if not lines:
+        print("  None found")
+    for line in lines:
+        print(f"  {line}")
+
+
+def advise(min_seq_rows, max_selectivity, top_statements, min_bloat_ratio):
+    """Collect statistics and print the index report."""
+    try:
+        # Autocommit so a failing EXPLAIN does not abort the rest of the report
+        with connection(autocommit=True) as conn, conn.cursor() as cur:
+            indexes = fetch_indexes(cur)
+            table_writes = fetch_table_writes(cur)
+
+            print_section(
+                "Unused indexes",
+                [
+                    f"{i['relname']}.{i['indexrelname']} ({format_size(i['size_bytes'])}): "
+                    f"{write_savings(i, indexes, table_writes)}"
+                    for i in find_unused(indexes)
+                ],
+            )
+
+            print_section(
+                "Redundant indexes",
+                [
+                    f"{i['relname']}.{i['indexrelname']} ({', '.join(i['columns'])}) "
+                    f"is covered by {other['indexrelname']} ({', '.join(other['columns'])}): "
+                    f"{write_savings(i, indexes, table_writes)}"
+                    for i, other in find_redundant(indexes)
+                ],
+            )
+
+            if extension_installed(cur, "pgstattuple"):
+                print_section(
+                    "Bloated indexes",
+                    [
+                        f"{i['relname']}.{i['indexrelname']}: ~{ratio:.0%} bloat, "
+                        f"{format_size(wasted)} of {format_size(i['size_bytes'])} reclaimable with REINDEX"
+                        for i, ratio, wasted in find_bloated(cur, indexes, min_bloat_ratio)
+                    ],
+                )
+            else:
+                print("\n⚠ Skipping bloat estimates: pgstattuple extension is not installed")
+
+            if extension_installed(cur, "pg_stat_statements"):
+                candidates = find_missing(cur, indexes, min_seq_rows, max_selectivity, top_statements)
+                print_section(
+                    "Missing-index candidates",
+                    [
+                        f"CREATE INDEX ON {table} ({', '.join(columns)}); "
+                        f"-- {stats['calls']:,} calls, {stats['total_exec_time']:.0f} ms total, "
+                        f"adds 1 index write per row written to {table}"
+                        for (table, columns), stats in candidates
+                    ],
+                )
+            else:
+                print(
+                    "\n⚠ Skipping missing-index candidates: "
+                    "pg_stat_statements extension is not installed"
+                )
+
+        return True
+
+    except psycopg.Error as e:
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report unused, redundant, bloated and missing indexes")
+    parser.add_argument(
+        "--min-seq-rows",
+        type=int,
+        default=10000,
+        help="Average rows read per sequential scan for a table to count as seq-scan heavy (default: 10000)",
+    )
+    parser.add_argument(
+        "--max-selectivity",
+        type=float,
+        default=0.05,
+        help="Largest estimated share of a table a filter may match to suggest an index (default: 0.05)",
+    )
+    parser.add_argument(
+        "--top-statements",
+        type=int,
+        default=20,
+        help="Number of most expensive statements to explain (default: 20)",
+    )
+    parser.add_argument(
+        "--min-bloat",
+        type=float,
+        default=0.3,
+        help="Minimum estimated bloat ratio to report an index (default: 0.3)",
+    )
+    args = parser.parse_args()
+
+    if not 0 < args.max_selectivity <= 1:
+        parser.error("--max-selectivity must be between 0 and 1")
+
+    if not healthcheck():
+        sys.exit(1)
+
+    success = advise(args.min_seq_rows, args.max_selectivity, args.top_statements, args.min_bloat)
+    sys.exit(0 if success else 1)
@@ -1,3 +1,7 @@
+-- Extension used by the index advisor for bloat estimates
+-- (pg_stat_statements is preloaded and created by the base image)
+CREATE EXTENSION IF NOT EXISTS pgstattuple;
+
 -- Create a test table
 CREATE TABLE customer_orders (
     id SERIAL PRIMARY KEY,
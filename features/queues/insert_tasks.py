@@ -1,30 +1,23 @@
 #!/usr/bin/env python3
 # /// script
 # dependencies = [
-#   "psycopg2-binary>=2.9.9",
-#   "python-dotenv>=1.0.0",
+#   "pgplayground",
 #   "ujson>=5.10.0",
 # ]
+#
+# [tool.uv.sources]
+# pgplayground = { path = "../..", editable = true }
 # ///
 
 import argparse
-import os
 import random
 import string
+import sys
 
-import psycopg2
 import ujson as json
-from dotenv import load_dotenv
 
-load_dotenv("../../.env")
-
-conn_params = {
-    "dbname": os.getenv("DB_NAME"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "host": os.getenv("DB_HOST"),
-    "port": int(os.getenv("DB_PORT", 5432)),
-}
+from pgplayground.db import connection, healthcheck
+from pgplayground.instrument import instrument
 
 
 def generate_random_payload(task_number):
@@ -48,39 +41,42 @@ def insert_tasks(num_tasks):
     Args:
         num_tasks (int): Number of tasks to insert
     """
-    conn = psycopg2.connect(**conn_params)
+    with metrics.phase("generate"):
+        payloads = [generate_random_payload(i) for i in range(1, num_tasks + 1)]
 
-    try:
-        with conn.cursor() as cur:
-            for i in range(1, num_tasks + 1):
-                # Generate payload with random data and processing time
-                payload = generate_random_payload(i)
+    with metrics.phase("serialize"):
+        rows = [(json.dumps(payload), payload["processing_time"]) for payload in payloads]
 
+    try:
+        # Pipeline mode sends all inserts without waiting for each result
+        with connection(pipeline=True) as conn, conn.cursor() as cur:
+            with metrics.phase("execute"):
                 # Store the suggested processing time in a dedicated column for easy querying
-                cur.execute(
+                cur.executemany(
                     """
-                    INSERT INTO tasks (payload, processing_time) 
-                    VALUES (%s, %s) 
+                    INSERT INTO tasks (payload, processing_time)
+                    VALUES (%s, %s)
                     RETURNING id
                 """,
-                    (json.dumps(payload), payload["processing_time"]),
+                    rows,
+                    returning=True,
                 )
 
-                task_id = cur.fetchone()[0]
-                print(
-                    f"Added task {task_id} with processing time {payload['processing_time']} seconds"
-                )
+                task_ids = [cur.fetchone()[0] for _ in cur.results()]
+
+            with metrics.phase("commit"):
+                conn.commit()
+
+        # Count outside the timed phases so Python work is not charged to Postgres
+        metrics.count("rows", len(task_ids))
+        if task_ids:
+            print(f"Added tasks {task_ids[0]} to {task_ids[-1]}")
 
-        conn.commit()
         print(f"✓ Successfully inserted {num_tasks} tasks")
 
     except Exception as e:
-        conn.rollback()
         print(f"Error inserting tasks: {e}")
 
-    finally:
-        conn.close()
-
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Insert tasks into the database")
@@ -92,4 +88,10 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
+    # Started after argument parsing so --help and usage errors are not reported
+    metrics = instrument("insert_tasks")
+
+    if not healthcheck():
+        sys.exit(1)
+
     insert_tasks(args.num_tasks)
@@ -1,49 +1,56 @@
 #!/usr/bin/env python3
 # /// script
 # dependencies = [
-#   "psycopg2-binary>=2.9.9",
-#   "python-dotenv>=1.0.0",
+#   "pgplayground",
 # ]
+#
+# [tool.uv.sources]
+# pgplayground = { path = "../..", editable = true }
 # ///
 
-import os
+import sys
 import time
 import uuid
 
-import psycopg2
-from dotenv import load_dotenv
-
-load_dotenv("../../.env")
-
-conn_params = {
-    "dbname": os.getenv("DB_NAME"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "host": os.getenv("DB_HOST"),
-    "port": int(os.getenv("DB_PORT", 5432)),
-}
+from pgplayground.db import connection, healthcheck
+from pgplayground.instrument import instrument
 
 
 def process_next_task(worker_id):
     """Claim and process a single task from the queue using FOR UPDATE SKIP LOCKED."""
-    conn = psycopg2.connect(**conn_params)
+    with connection() as conn:
+        return _process_next_task(conn, worker_id)
 
-    # Turn off autocommit to manage the transaction manually
-    conn.autocommit = False
 
+def _process_next_task(conn, worker_id):
+    """Claim and process a single task on a pooled connection."""
     try:
         with conn.cursor() as cur:
-            # The key query that grabs an available task and locks it
+            # The key query that grabs an available task, locks it, and marks it
+            # as processing in a single round-trip
             # FOR UPDATE locks the row so other transactions cannot modify it
             # SKIP LOCKED means if a row is already locked, skip it and find another
-            cur.execute("""
-                SELECT id, payload, processing_time 
-                FROM tasks 
-                WHERE status = 'pending' 
-                ORDER BY created_at 
-                FOR UPDATE SKIP LOCKED
-                LIMIT 1
-            """)
+            # prepare=True keeps it as a server-side prepared statement on this connection
+            with metrics.phase("execute"):
+                cur.execute(
+                    """
+                    UPDATE tasks
+                    SET status = 'processing',
+                        updated_at = NOW(),
+                        worker_id = %s
+                    WHERE id = (
+                        SELECT id
+                        FROM tasks
+                        WHERE status = 'pending'
+                        ORDER BY created_at
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT 1
+                    )
+                    RETURNING id, payload, processing_time
+                """,
+                    (worker_id,),
+                    prepare=True,
+                )
 
             # Check if we found an available task
             task = cur.fetchone()
@@ -55,49 +62,42 @@ def process_next_task(worker_id):
             # Extract task details
             task_id, payload, processing_time = task
 
-            # No need to decode or parse the payload as psycopg2 already converts JSONB to Python dict
+            # No need to decode or parse the payload as psycopg already converts JSONB to Python dict
             # Just use the payload directly
 
-            # Mark the task as processing and record which worker claimed it
+            # The task is now marked as processing and records which worker claimed it
             print(f"Worker {worker_id}: Claiming task {task_id}")
-            cur.execute(
-                """
-                UPDATE tasks 
-                SET status = 'processing', 
-                    updated_at = NOW(),
-                    worker_id = %s
-                WHERE id = %s
-            """,
-                (worker_id, task_id),
-            )
 
             # Commit the transaction to release the lock but keep the status updated
             # This lets us see the task as "processing" in DBeaver
-            conn.commit()
-
-            # Start a new transaction for the actual processing
-            conn.autocommit = False
+            with metrics.phase("commit"):
+                conn.commit()
 
             # Simulate the task processing with the suggested processing time
             print(
                 f"Worker {worker_id}: Processing task {task_id} (will take {processing_time} seconds)..."
             )
-            time.sleep(processing_time)  # This gives you time to observe in DBeaver
+            with metrics.phase("process"):
+                time.sleep(processing_time)  # This gives you time to observe in DBeaver
 
             # Mark the task as completed
-            cur.execute(
-                """
-                UPDATE tasks 
-                SET status = 'completed', 
-                    processed_at = NOW(), 
-                    updated_at = NOW() 
-                WHERE id = %s
-            """,
-                (task_id,),
-            )
+            with metrics.phase("execute"):
+                cur.execute(
+                    """
+                    UPDATE tasks 
+                    SET status = 'completed', 
+                        processed_at = NOW(), 
+                        updated_at = NOW() 
+                    WHERE id = %s
+                """,
+                    (task_id,),
+                    prepare=True,
+                )
 
             # Commit the completion
-            conn.commit()
+            with metrics.phase("commit"):
+                conn.commit()
+            metrics.count("tasks")
             print(f"Worker {worker_id}: Completed task {task_id}")
             return True
 
@@ -106,6 +106,9 @@ def process_next_task(worker_id):
         print(f"Worker {worker_id}: Error processing task: {e}")
 
         try:
+            # Clear an aborted transaction before marking the task
+            conn.rollback()
+
             # Only attempt to update if we have a task_id from earlier in the function
             if "task_id" in locals():
                 with conn.cursor() as cur:
@@ -127,9 +130,6 @@ def process_next_task(worker_id):
 
         return False
 
-    finally:
-        conn.close()
-
 
 def worker_loop(worker_id):
     """Keep processing tasks until there are none left."""
@@ -160,9 +160,14 @@ def worker_loop(worker_id):
 
 
 if __name__ == "__main__":
+    metrics = instrument("process_tasks")
+
     # Generate a unique worker ID so we can identify different processes
     worker_id = str(uuid.uuid4())[:8]
 
+    if not healthcheck():
+        sys.exit(1)
+
     # Start the worker loop
     total_processed = worker_loop(worker_id)
 
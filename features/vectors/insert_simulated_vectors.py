@@ -2,28 +2,20 @@
 # /// script
 # dependencies = [
 #   "numpy>=1.26.0",
-#   "psycopg2-binary>=2.9.9",
-#   "python-dotenv>=1.0.0",
+#   "pgplayground",
 # ]
+#
+# [tool.uv.sources]
+# pgplayground = { path = "../..", editable = true }
 # ///
 
-import os
 import argparse
+import sys
 
 import numpy as np
-import psycopg2
-from dotenv import load_dotenv
-from psycopg2.extras import execute_values
 
-load_dotenv("../../.env")
-
-conn_params = {
-    "dbname": os.getenv("DB_NAME"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "host": os.getenv("DB_HOST"),
-    "port": int(os.getenv("DB_PORT", 5432)),
-}
+from pgplayground.db import connection, healthcheck
+from pgplayground.instrument import instrument
 
 
 def generate_random_vector(dimension=384):
@@ -40,35 +32,32 @@ def insert_sample_data(num_samples=1_000):
     """Insert sample vector data into the database."""
     print(f"Inserting {num_samples} sample vectors...")
 
-    # Connect to the database
-    conn = psycopg2.connect(**conn_params)
-
     try:
-        with conn.cursor() as cur:
+        with connection() as conn, conn.cursor() as cur:
             # Prepare data for batch insert
-            data = []
-            for i in range(num_samples):
-                embedding_id = f"sample_{i + 1}"
-                vector = generate_random_vector()
-                vector_str = vector_to_string(vector)
-                data.append((embedding_id, vector_str))
-
-            # Use execute_values for efficient batch insertion
-            execute_values(
-                cur,
-                "INSERT INTO embeddings (embedding_id, embedding) VALUES %s",
-                data,
-                template="(%s, %s::vector)",
-            )
-
-            conn.commit()
+            with metrics.phase("generate"):
+                vectors = [generate_random_vector() for _ in range(num_samples)]
+
+            with metrics.phase("serialize"):
+                data = [
+                    (f"sample_{i + 1}", vector_to_string(vector))
+                    for i, vector in enumerate(vectors)
+                ]
+
+            # Use executemany for efficient batch insertion, it pipelines the inserts
+            with metrics.phase("execute"):
+                cur.executemany(
+                    "INSERT INTO embeddings (embedding_id, embedding) VALUES (%s, %s::vector)",
+                    data,
+                )
+            metrics.count("rows", len(data))
+
+            with metrics.phase("commit"):
+                conn.commit()
             print(f"Successfully inserted {num_samples} sample vectors.")
 
     except Exception as e:
         print(f"Error inserting vectors: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
 
 
 if __name__ == "__main__":
@@ -83,5 +72,11 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
+    # Started after argument parsing so --help and usage errors are not reported
+    metrics = instrument("insert_simulated_vectors")
+
+    if not healthcheck():
+        sys.exit(1)
+
     insert_sample_data(args.num_vectors)
     print("Vector insertion completed successfully.")
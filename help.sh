@@ -58,10 +58,12 @@ _help_variables() {
 
     if [[ -s "$tmpfile" ]]; then
         echo "Variable(s):"
-        sort "$tmpfile" | while read -r line; do
+        # Keep the first definition of each variable, the including Makefile is listed first
+        awk '!seen[$1]++' "$tmpfile" | sort | while read -r line; do
             variable=${line%% *}
             default=${line#*= }
             default=${default%%##*}
+            default=${default%"${default##*[![:space:]]}"}
             description=${line##*## }
             printf "  %b%-30s%b%s %b(default: %s)%b\n" "$variable_col" "$variable" "$col_off" "$description" "$grey" "$default" "$col_off"
         done
@@ -0,0 +1,131 @@
+"""
+Shared database access for the feature scripts.
+
+Every script gets its connections from one process-wide, thread-safe
+connection pool instead of calling connect() per operation, so the cost of
+connecting is paid once per process. Connections are checked before they are
+handed out, broken ones are replaced by the pool, and idempotent operations
+can be retried on connection failures with run_with_retry().
+
+Server-side prepared statements come from psycopg itself: pass prepare=True
+to cursor.execute() for statements on a hot path, and psycopg prepares them
+once per connection. Since pooled connections are reused, the statement
+stays prepared for the lifetime of the process.
+"""
+
+import atexit
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import psycopg
+from dotenv import load_dotenv
+from psycopg_pool import ConnectionPool
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Resolve .env from the repository root, independent of the working directory
+load_dotenv(ROOT_DIR / ".env")
+
+conn_params = {
+    "dbname": os.getenv("DB_NAME", "testdb"),
+    "user": os.getenv("DB_USER", "testuser"),
+    "password": os.getenv("DB_PASSWORD", "testpassword"),
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": int(os.getenv("DB_PORT", 5432)),
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(min_size=1, max_size=4):
+    """Return the process-wide connection pool, opening it on first use.
+
+    The sizes only apply to the first call, which creates the pool. The pool
+    is closed automatically when the process exits.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                kwargs=conn_params,
+                min_size=min_size,
+                max_size=max_size,
+                # Verify each connection is still alive before handing it out
+                check=ConnectionPool.check_connection,
+                name="pgplayground",
+                # Fail fast instead of waiting the default 30s for a connection
+                timeout=10,
+                open=True,
+            )
+            atexit.register(_pool.close)
+
+    return _pool
+
+
+@contextmanager
+def connection(pipeline=False, autocommit=False):
+    """Borrow a connection from the pool.
+
+    The transaction is committed when the block exits normally and rolled back
+    if it raises, and the connection is returned to the pool either way.
+
+    Args:
+        pipeline (bool): Run the block in pipeline mode, sending statements
+            without waiting for each result so a batch costs one round-trip
+        autocommit (bool): Run the block in autocommit mode, e.g. for VACUUM
+    """
+    with get_pool().connection() as conn:
+        conn.autocommit = autocommit
+        try:
+            if pipeline:
+                with conn.pipeline():
+                    yield conn
+            else:
+                yield conn
+        finally:
+            # Hand the connection back in the pool's default mode
+            if autocommit and not conn.closed:
+                conn.autocommit = False
+
+
+def run_with_retry(func, *args, attempts=3, backoff=0.5, **kwargs):
+    """Call func, retrying on connection failures with exponential backoff.
+
+    Only psycopg.OperationalError is retried, since that is what a dropped or
+    refused connection raises. Errors in the SQL itself are raised at once.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return func(*args, **kwargs)
+        except psycopg.OperationalError as e:
+            if attempt == attempts:
+                raise
+            delay = backoff * 2 ** (attempt - 1)
+            print(
+                f"Database connection failed ({e}), retrying in {delay:.1f}s "
+                f"(attempt {attempt}/{attempts})",
+                file=sys.stderr,
+            )
+            time.sleep(delay)
+
+
+def _ping():
+    """Run a trivial query on a pooled connection."""
+    with connection() as conn:
+        conn.execute("SELECT 1")
+
+
+def healthcheck(attempts=3):
+    """Check that the database accepts queries, retrying while it starts up."""
+    try:
+        run_with_retry(_ping, attempts=attempts)
+        return True
+    except psycopg.Error as e:
+        print(f"✗ Database health check failed: {e}", file=sys.stderr)
+        return False
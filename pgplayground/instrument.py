@@ -0,0 +1,162 @@
+"""
+Timing instrumentation for the feature scripts.
+
+Scripts wrap their hot paths in named phases (e.g. generate, serialize,
+execute, commit) and count the rows they handle. At exit a summary is printed
+and emitted as a single JSON line, so a slow run can be attributed to Python
+(CPU time close to wall time, time spent in generate/serialize) or to
+Postgres (time spent in execute/commit while the process is idle).
+
+Behaviour is controlled with environment variables:
+
+- PGPLAYGROUND_METRICS_FILE: append the JSON summary to this file instead of
+  writing it to stderr
+- PGPLAYGROUND_PROGRESS_INTERVAL: minimum seconds between progress lines
+  (default: 1)
+- PGPLAYGROUND_PROFILE: run the script under cProfile and write the stats to
+  this file, for use with pstats or snakeviz. Sampling profilers like py-spy
+  need no hook (py-spy record -- uv run script.py), but should not be combined
+  with cProfile, which slows down every function call.
+"""
+
+import atexit
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class Metrics:
+    """Per-phase timers, counters, and rate-limited progress for one script."""
+
+    def __init__(self, script, progress_interval=1.0):
+        self.script = script
+        self.progress_interval = progress_interval
+        self.phase_seconds = defaultdict(float)
+        self.phase_calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._last_progress = 0.0
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of work under the given phase name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phase_seconds[name] += elapsed
+                self.phase_calls[name] += 1
+
+    def count(self, name, amount=1):
+        """Add to a counter, e.g. the number of rows inserted."""
+        with self._lock:
+            self.counters[name] += amount
+
+    def progress(self, message):
+        """Print a progress line, at most once per progress interval."""
+        now = time.perf_counter()
+        if now - self._last_progress < self.progress_interval:
+            return
+        self._last_progress = now
+        print(message, flush=True)
+
+    def rate(self, name):
+        """Return a counter's average rate per second since the start."""
+        elapsed = time.perf_counter() - self._start
+        return self.counters[name] / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        """Return the collected metrics as a JSON-serialisable dict."""
+        wall_seconds = time.perf_counter() - self._start
+        cpu_seconds = time.process_time() - self._cpu_start
+
+        return {
+            "script": self.script,
+            "pid": os.getpid(),
+            "wall_seconds": round(wall_seconds, 3),
+            "cpu_seconds": round(cpu_seconds, 3),
+            # Close to 1 means CPU-bound in Python, close to 0 means waiting on I/O
+            "cpu_share": round(cpu_seconds / wall_seconds, 3) if wall_seconds else 0.0,
+            "phases": {
+                name: {
+                    "seconds": round(seconds, 3),
+                    "calls": self.phase_calls[name],
+                    "share": round(seconds / wall_seconds, 3) if wall_seconds else 0.0,
+                }
+                for name, seconds in self.phase_seconds.items()
+            },
+            "counters": {
+                name: {
+                    "total": total,
+                    "per_second": round(total / wall_seconds, 1) if wall_seconds else 0.0,
+                }
+                for name, total in self.counters.items()
+            },
+        }
+
+    def report(self):
+        """Print a readable summary and emit it as one JSON line."""
+        summary = self.summary()
+
+        print(
+            f"\n⏱ {self.script}: {summary['wall_seconds']:.2f}s wall, "
+            f"{summary['cpu_seconds']:.2f}s CPU ({summary['cpu_share']:.0%})",
+            file=sys.stderr,
+        )
+        for name, phase in summary["phases"].items():
+            print(
+                f"  {name:<12} {phase['seconds']:>9.3f}s {phase['share']:>6.1%}  ({phase['calls']} calls)",
+                file=sys.stderr,
+            )
+        for name, counter in summary["counters"].items():
+            print(
+                f"  {name:<12} {counter['total']:>10,}  ({counter['per_second']:,.1f}/s)",
+                file=sys.stderr,
+            )
+
+        line = json.dumps(summary)
+        metrics_file = os.getenv("PGPLAYGROUND_METRICS_FILE")
+        if metrics_file:
+            # Append so several workers can share one file
+            with open(metrics_file, "a") as f:
+                f.write(line + "\n")
+        else:
+            print(line, file=sys.stderr)
+
+
+def instrument(script):
+    """Create the metrics for this process and report them at exit.
+
+    Also starts cProfile when PGPLAYGROUND_PROFILE is set. Call it from the
+    __main__ block after parsing arguments, so importing the script, --help,
+    and usage errors are not timed or reported.
+    """
+    metrics = Metrics(
+        script,
+        progress_interval=float(os.getenv("PGPLAYGROUND_PROGRESS_INTERVAL", 1)),
+    )
+
+    profile_output = os.getenv("PGPLAYGROUND_PROFILE")
+    if profile_output:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def dump_profile():
+            profiler.disable()
+            profiler.dump_stats(profile_output)
+            print(f"cProfile stats written to {profile_output}", file=sys.stderr)
+
+        # atexit runs handlers in reverse order, so the profile is dumped after the report
+        atexit.register(dump_profile)
+
+    atexit.register(metrics.report)
+    return metrics
@@ -0,0 +1,33 @@
+#!/bin/bash
+
+# This script enables the selected performance profile on a fresh data directory.
+# It runs from /docker-entrypoint-initdb.d/ before the feature's init.sql.
+# Usage: PG_PROFILE=bulk-load (one of the .conf files in /etc/postgresql/profiles)
+
+set -e
+
+profile_dir=/etc/postgresql/profiles
+profile="$profile_dir/${PG_PROFILE:-default}.conf"
+
+if [[ ! -f "$profile" ]]; then
+    echo "Unknown profile '${PG_PROFILE}'. Available profiles:"
+    ls "$profile_dir" | grep -v '^common.conf$' | sed 's/\.conf$//'
+    exit 1
+fi
+
+echo "Enabling PostgreSQL profile: ${PG_PROFILE:-default}"
+
+cat >> "$PGDATA/postgresql.conf" <<CONF
+
+# Performance profile
+include '$profile_dir/common.conf'
+include '$profile'
+CONF
+
+# Reload so the feature's init scripts already run with the reloadable settings
+# (work_mem, maintenance_work_mem, max_wal_size, checkpoints, synchronous_commit).
+# Restart-only settings (shared_buffers, wal_level, shared_preload_libraries)
+# take effect when the server restarts after initialization.
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" \
+    -c "SELECT pg_reload_conf();" \
+    -c "CREATE EXTENSION IF NOT EXISTS pg_stat_statements;"